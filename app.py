@@ -4,8 +4,10 @@ import json
 import os
 import random
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -14,6 +16,13 @@ try:
 except Exception:  # pragma: no cover
     load_dotenv = None  # type: ignore
 
+try:  # Optional: faster JSON decode for audit payloads.
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_json_loads = orjson.loads if orjson else json.loads
+
 import db
 import game_logic
 import security
@@ -35,6 +44,9 @@ div[data-testid="stElementContainer"] {
 </style>
 """
 
+_ALL_DIGITS = tuple(range(10))
+
+
 def _audit_ids(ids: list[int], limit: int = 25) -> dict:
     ids = [int(x) for x in ids]
     return {"count": len(ids), "ids": ids[:limit], "truncated": (len(ids) > limit)}
@@ -121,6 +133,18 @@ __SCOPE__ .corner {
   height: var(--sb-cell);
 }
 
+/* Column-digit header: one flex row instead of 11 Streamlit columns. */
+__SCOPE__ .sb-digit-row {
+  display: flex;
+  gap: var(--sb-gap);
+  width: max-content;
+}
+__SCOPE__ .sb-digit-row .digit,
+__SCOPE__ .sb-digit-row .corner {
+  width: var(--sb-cell);
+  flex: 0 0 var(--sb-cell);
+}
+
 __SCOPE__ button {
   width: 100%;
   height: var(--sb-cell);
@@ -200,10 +224,47 @@ __SCOPE__ button:disabled {
 """
 
 
+def _fragment(func):
+    """Wrap a render function in st.fragment when available.
+
+    Inside a fragment, board clicks rerun only the fragment instead of the
+    whole script (no load_state, winners, or audit re-fetch per toggle).
+    Falls back to a plain call on Streamlit versions without fragments.
+    """
+    frag = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return frag(func) if frag else func
+
+
+def _rerun_board() -> None:
+    # Scope the rerun to the enclosing fragment when supported.
+    try:
+        st.rerun(scope="fragment")
+    except TypeError:
+        st.rerun()
+
+
+def _inject_global_css() -> None:
+    # Must run on every rerun: Streamlit replaces the page DOM each script run,
+    # so a session-state "already injected" guard would leave the app unstyled
+    # after the first interaction. The string is a module constant, so the only
+    # per-rerun cost is the single markdown element (which Streamlit dedupes
+    # in its frontend diff).
+    st.markdown(_GLOBAL_CSS, unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=8)
+def _grid_css_for(scope_selector: str) -> str:
+    # The scoped CSS is ~4 KB with ~50 substitutions; there are only a couple of
+    # grid prefixes per app, so cache the substituted blob per scope.
+    return _GRID_CSS.replace("__SCOPE__", scope_selector)
+
+
+@lru_cache(maxsize=256)
 def _ts_to_str(ts: int) -> str:
     return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
 
 
+@lru_cache(maxsize=512)
 def _short_name(name: str) -> str:
     parts = [p for p in name.strip().split() if p]
     if not parts:
@@ -212,6 +273,7 @@ def _short_name(name: str) -> str:
         return parts[0][:2].upper()
     return (parts[0][:1] + parts[-1][:1]).upper()
 
+@lru_cache(maxsize=512)
 def _cell_label(name: str) -> str:
     first = (name or "").strip().split(" ")[0] if name else ""
     if not first:
@@ -219,13 +281,41 @@ def _cell_label(name: str) -> str:
     return first[:6]
 
 
+def _client_key() -> str:
+    # Best-effort client identifier for rate limiting (proxy header when hosted).
+    try:
+        headers = getattr(st.context, "headers", None) or {}
+        return str(headers.get("x-forwarded-for", "local")).split(",")[0].strip() or "local"
+    except Exception:
+        return "local"
+
+
+@st.cache_resource(show_spinner=False)
+def _bootstrap() -> bool:
+    # Schema creation + admin bootstrap, once per process. The CREATE TABLE /
+    # INSERT OR IGNORE statements are no-ops after first run but SQLite still
+    # parses and plans them, so keep them off the per-action hot paths.
+    with db.db() as conn:
+        db.init_db(conn)
+        db.ensure_admin_from_env(conn)
+    return True
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_user_cached(user_id: int) -> db.User | None:
+    # User records change rarely (display name, admin flag); cache the fetch
+    # that otherwise runs on every rerun of every authenticated page. Admin
+    # flows that mutate users call _load_user_cached.clear().
+    with db.db() as conn:
+        return db.get_user(conn, user_id)
+
+
 def require_login() -> db.User:
     user_id = st.session_state.get("user_id")
     if not user_id:
         st.info("Sign in to claim squares and see your boxes.")
         st.stop()
-    with db.db() as conn:
-        user = db.get_user(conn, int(user_id))
+    user = _load_user_cached(int(user_id))
     if not user:
         st.session_state.pop("user_id", None)
         st.warning("Session expired. Please sign in again.")
@@ -240,11 +330,15 @@ def require_admin(user: db.User) -> None:
 
 
 def board_df(squares: list[dict]) -> pd.DataFrame:
-    cells: list[list[str]] = [["" for _ in range(10)] for _ in range(10)]
-    for sq in squares:
-        r, c = game_logic.row_col_from_id(int(sq["id"]))
-        owner = sq.get("owner_display_name") or ""
-        cells[r][c] = _short_name(owner) if owner else ""
+    ids = np.fromiter((int(s["id"]) for s in squares), dtype=np.int16, count=len(squares))
+    rows, cols = np.divmod(ids, 10)
+    names = np.array(
+        [_short_name(s["owner_display_name"]) if s.get("owner_display_name") else "" for s in squares],
+        dtype=object,
+    )
+    cells = np.empty((10, 10), dtype=object)
+    cells[:] = ""
+    cells[rows, cols] = names
     return pd.DataFrame(cells, index=[f"R{r}" for r in range(10)], columns=[f"C{c}" for c in range(10)])
 
 def render_board_grid(
@@ -267,14 +361,57 @@ def render_board_grid(
     scope_selector = f"div[data-testid='stVerticalBlock']:has(#{scope_id})"
     container = st.container()
 
-    square_map = {int(s["id"]): s for s in squares}
     row_labels = row_digits if row_digits else ["?"] * 10
     col_labels = col_digits if col_digits else ["?"] * 10
-    selected_ids = selected_ids or set()
     winning_squares = winning_squares or {}
 
+    # Flatten the squares into index-addressable lists once, instead of doing
+    # dict lookups per cell inside the 10x10 loop.
+    owner_ids: list[int | None] = [None] * 100
+    owner_names: list[str] = [""] * 100
+    owner_labels: list[str] = [""] * 100
+    for s in squares:
+        i = int(s["id"])
+        owner = s.get("owner_user_id")
+        owner_ids[i] = int(owner) if owner is not None else None
+        owner_names[i] = s.get("owner_display_name") or ""
+        owner_labels[i] = _cell_label(owner_names[i]) if owner_names[i] else ""
+    sel = frozenset(int(x) for x in (selected_ids or ()))
+    hi = int(highlight_user_id) if highlight_user_id else 0
+    can_select = bool(on_toggle_select)
+
+    # There are only a handful of distinct cell states per render (owned/mine/
+    # selected), so resolve (type, help, disabled, togglable) once per state
+    # instead of re-running the branch ladder for all 100 cells. A help text of
+    # None means "use the owner's display name" (the only per-cell variant).
+    def _resolve_state(has_owner: bool, is_mine: bool, is_selected: bool) -> tuple[str, str | None, bool, bool]:
+        can_toggle_open = can_select and not has_owner
+        can_toggle_own = can_select and allow_toggle_own and is_mine
+        can_toggle = can_toggle_open or can_toggle_own
+        if has_owner:
+            if is_selected and can_toggle_own:
+                button_type, help_txt = "secondary", "Will release"
+            elif can_toggle_own:
+                button_type, help_txt = "primary", "Yours"
+            else:
+                button_type, help_txt = "secondary", None
+        else:
+            button_type = "tertiary"
+            if click_to_claim:
+                help_txt = "Click to claim"
+            elif can_toggle_open:
+                help_txt = "Will claim" if is_selected else "Select to claim"
+            else:
+                help_txt = "Open"
+        disabled = (has_owner and not can_toggle) or (not click_to_claim and not can_toggle)
+        return button_type, help_txt, disabled, can_toggle
+
+    state_cache: dict[tuple[bool, bool, bool], tuple[str, str | None, bool, bool]] = {}
+
     container.markdown(f"<div id='{scope_id}'></div>", unsafe_allow_html=True)
-    container.markdown(_GRID_CSS.replace("__SCOPE__", scope_selector), unsafe_allow_html=True)
+    # Note: the CSS must be emitted on every rerun — Streamlit rebuilds the page
+    # each run, so a session-level "emit once" guard would drop the styles.
+    container.markdown(_grid_css_for(scope_selector), unsafe_allow_html=True)
 
     # Layout like the reference image:
     # - team_columns as a big title centered above
@@ -290,10 +427,12 @@ def render_board_grid(
 
     grid = outer[1]
     grid.markdown("<div class='sb-grid-scroll'><div class='sb-grid-inner'>", unsafe_allow_html=True)
-    header = grid.columns([0.72] + [1] * 10)
-    header[0].markdown("<div class='corner'></div>", unsafe_allow_html=True)
-    for c in range(10):
-        header[c + 1].markdown(f"<div class='digit digit-top'>{col_labels[c]}</div>", unsafe_allow_html=True)
+    # One markdown element for the whole header row instead of 11 column widgets.
+    header_cells = "".join(f"<div class='digit digit-top'>{d}</div>" for d in col_labels)
+    grid.markdown(
+        f"<div class='sb-digit-row'><div class='corner'></div>{header_cells}</div>",
+        unsafe_allow_html=True,
+    )
 
     def _button(container, *, label_: str, key_: str, disabled_: bool, type_: str, help_: str):
         try:
@@ -307,53 +446,34 @@ def render_board_grid(
         row_cols = grid.columns([0.72] + [1] * 10)
         row_cols[0].markdown(f"<div class='digit digit-left'>{row_labels[r]}</div>", unsafe_allow_html=True)
         for c in range(10):
-            sq_id = game_logic.square_id(r, c)
-            sq = square_map[sq_id]
-            owner_id = sq.get("owner_user_id")
-            owner_name = sq.get("owner_display_name") or ""
-            is_selected = int(sq_id) in selected_ids
-            winner_quarters = winning_squares.get(int(sq_id), [])
+            sq_id = r * 10 + c
+            owner_id = owner_ids[sq_id]
+            owner_name = owner_names[sq_id]
+            is_selected = sq_id in sel
+            winner_quarters = winning_squares.get(sq_id, [])
             is_winner = bool(winner_quarters)
             winner_suffix = f" | Winner Q{','.join(str(q) for q in sorted(winner_quarters))}" if is_winner else ""
 
-            can_toggle_open = bool(on_toggle_select) and (not owner_id)
-            can_toggle_own = (
-                bool(on_toggle_select)
-                and allow_toggle_own
-                and bool(highlight_user_id)
-                and bool(owner_id)
-                and int(owner_id) == int(highlight_user_id)
-            )
-            can_toggle = can_toggle_open or can_toggle_own
-
-            if owner_id:
-                label = _cell_label(owner_name)
-                if is_selected and can_toggle_own:
-                    help_txt = "Will release"
-                    button_type = "secondary"
-                elif can_toggle_own:
-                    help_txt = "Yours"
-                    button_type = "primary"
-                else:
-                    help_txt = owner_name
-                    button_type = "secondary"
+            has_owner = owner_id is not None
+            is_mine = bool(hi) and owner_id == hi
+            state_key = (has_owner, is_mine, is_selected)
+            state = state_cache.get(state_key)
+            if state is None:
+                state = state_cache[state_key] = _resolve_state(*state_key)
+            button_type, help_txt, disabled, can_toggle = state
+            if help_txt is None:
+                help_txt = owner_name
+
+            if has_owner:
+                label = owner_labels[sq_id]
                 if is_winner:
                     label = (f"⭐{label}")[:6]
                     help_txt = f"{help_txt}{winner_suffix}"
             else:
-                label = "✓" if (is_selected and can_toggle_open and not click_to_claim) else "☐"
-                if click_to_claim:
-                    help_txt = "Click to claim"
-                elif can_toggle_open:
-                    help_txt = "Will claim" if is_selected else "Select to claim"
-                else:
-                    help_txt = "Open"
-                button_type = "tertiary"
+                label = "✓" if (is_selected and can_select and not click_to_claim) else "☐"
                 if is_winner and not is_selected:
                     label = "⭐"
                     help_txt = f"{help_txt}{winner_suffix}"
-
-            disabled = (bool(owner_id) and not can_toggle) or (not click_to_claim and not can_toggle)
             clicked = _button(
                 row_cols[c + 1],
                 label_=label,
@@ -371,10 +491,8 @@ def render_board_grid(
 
 def load_state():
     with db.db() as conn:
-        # Backwards-compatible: if Streamlit has an older `db` module loaded, don't crash.
-        # A full app restart will pick up the new versioned caching.
-        get_ver = getattr(db, "get_state_version", None)
-        db_version = get_ver(conn) if callable(get_ver) else "legacy"
+        # Cheap cache key: one settings-row read. Every write path bumps `board_version`.
+        db_version = db.get_state_version(conn)
     # Extra nonce ensures UI refreshes immediately after writes, even if the DB version
     # can't be computed (or timestamps collide within the same second).
     nonce = int(st.session_state.get("_sb_state_nonce", 0))
@@ -389,18 +507,24 @@ def _invalidate_state_cache() -> None:
         pass
 
 
+@st.cache_data(ttl=5, show_spinner=False)
+def _recent_audit_cached(nonce: int, limit: int = 15) -> list[dict]:
+    # No underscore on `nonce`: st.cache_data would drop it from the key and
+    # serve stale activity for the TTL despite the session's nonce bump.
+    with db.db() as conn:
+        return db.recent_audit(conn, limit=limit)
+
+
 @st.cache_data(show_spinner=False)
-def _load_state_cached(_version: str):
+def _load_state_cached(version: str):
+    # `version` must not be underscore-prefixed: st.cache_data drops such
+    # parameters from the cache key, which would collapse this to a single
+    # entry and make the board_version keying a no-op.
     with db.db() as conn:
-        settings = {
-            "team_columns": db.get_setting(conn, "team_columns"),
-            "team_rows": db.get_setting(conn, "team_rows"),
-            "price_per_square": db.get_setting(conn, "price_per_square"),
-            "board_locked": db.get_setting(conn, "board_locked") == "1",
-            "row_digits_json": db.get_setting(conn, "row_digits_json"),
-            "col_digits_json": db.get_setting(conn, "col_digits_json"),
-            "max_boxes_per_user": db.get_setting(conn, "max_boxes_per_user"),
-        }
+        # One query for the whole settings table; the table only ever holds
+        # the eight known keys, so this is cheaper than enumerating them.
+        settings = db.get_all_settings(conn)
+        settings["board_locked"] = settings["board_locked"] == "1"
         squares_rows = db.list_squares(conn)
     squares = [dict(r) for r in squares_rows]
     row_digits = game_logic.parse_digits(settings["row_digits_json"])
@@ -416,7 +540,6 @@ def page_auth():
     )
 
     with db.db() as conn:
-        db.init_db(conn)
         has_users = db.any_users_exist(conn)
 
     tab1, tab2 = st.tabs(["Sign in", "Create account" if has_users else "Create admin account"])
@@ -428,19 +551,32 @@ def page_auth():
             submitted = st.form_submit_button("Sign in")
         login_error: str | None = None
         if submitted:
+            # Keep the KDF outside the db() context: on SQLite that context
+            # holds the process-wide lock, and a ~100 ms PBKDF2 round inside
+            # it would stall every other session's DB access per attempt.
+            row = None
             with db.db() as conn:
-                row = db.get_user_by_username(conn, username.strip().lower())
-                if not row:
-                    login_error = "No such user."
-                elif not security.verify_password(
-                    password,
-                    salt_b64=str(row["salt_b64"]),
-                    password_hash_b64=str(row["password_hash_b64"]),
-                ):
-                    login_error = "Wrong password."
+                rate_key = f"{username.strip().lower()}|{_client_key()}"
+                if not db.check_login_rate(conn, rate_key):
+                    login_error = "Too many attempts. Wait a bit and try again."
                 else:
-                    st.session_state["user_id"] = int(row["id"])
-                    st.session_state["nav_page"] = "Home"
+                    row = db.get_user_by_username(conn, username.strip().lower())
+            if login_error:
+                pass
+            elif not row:
+                # Burn a KDF round anyway so timing doesn't leak which
+                # usernames exist.
+                security.dummy_verify(password)
+                login_error = "No such user."
+            elif not security.verify_password(
+                password,
+                salt_b64=str(row["salt_b64"]),
+                password_hash_b64=str(row["password_hash_b64"]),
+            ):
+                login_error = "Wrong password."
+            else:
+                st.session_state["user_id"] = int(row["id"])
+                st.session_state["nav_page"] = "Home"
             if login_error:
                 # Don't `st.stop()` here — it prevents the Create account tab from rendering on the same run.
                 st.error(login_error)
@@ -475,10 +611,10 @@ def page_auth():
             if reserved_admin and username.strip().lower() == reserved_admin:
                 st.error("That username is reserved for the admin.")
                 st.stop()
+            # Hash before entering the db() context (see sign-in handler).
+            salt_b64, hash_b64 = security.hash_password(password)
             with db.db() as conn:
-                db.init_db(conn)
                 is_admin = (not reserved_admin) and (not db.any_users_exist(conn))
-                salt_b64, hash_b64 = security.hash_password(password)
                 try:
                     user_id = db.create_user(
                         conn,
@@ -507,20 +643,22 @@ def page_home(user: db.User | None):
         max_boxes_per_user = 0
 
     winning_squares: dict[int, list[int]] = {}
+    scores_by_q: dict[int, dict] = {}
+    win_ids: dict[int, int] = {}
     if row_digits and col_digits:
         with db.db() as conn:
-            for q in (1, 2, 3, 4):
-                score = db.get_score(conn, q)
-                # Only highlight once an admin has entered a score for that quarter.
-                if score.get("updated_by_user_id") is None:
-                    continue
-                win_sq = game_logic.compute_winner_square_id(
-                    rows_score=int(score["rows_score"]),
-                    cols_score=int(score["cols_score"]),
-                    row_digits=row_digits,
-                    col_digits=col_digits,
-                )
-                winning_squares.setdefault(int(win_sq), []).append(int(q))
+            scores_by_q = db.get_scores_many(conn)
+        # Only consider quarters where an admin has entered a score.
+        entered = {
+            q: (int(s["rows_score"]), int(s["cols_score"]))
+            for q, s in scores_by_q.items()
+            if s.get("updated_by_user_id") is not None
+        }
+        win_ids = game_logic.compute_winner_square_ids(
+            scores=entered, row_digits=row_digits, col_digits=col_digits
+        )
+        for q, win_sq in win_ids.items():
+            winning_squares.setdefault(int(win_sq), []).append(int(q))
 
     st.header("2026 EMCO Super Bowl LX Squares")
     st.write(
@@ -528,8 +666,20 @@ def page_home(user: db.User | None):
         "When scores update each quarter, we will highlight the winning square."
     )
 
+    # One pass over the 100 squares for everything this page needs: the
+    # claimed metric plus the open/mine id sets used by the board section.
+    my_ids: set[int] = set()
+    open_ids: set[int] = set()
+    uid = user.id if user else None
+    for s in squares:
+        owner = s.get("owner_user_id")
+        if owner is None:
+            open_ids.add(int(s["id"]))
+        elif uid is not None and owner == uid:
+            my_ids.add(int(s["id"]))
+
     c1, c2, c3, c4 = st.columns(4)
-    claimed = sum(1 for s in squares if s.get("owner_user_id"))
+    claimed = len(squares) - len(open_ids)
     c1.metric("Claimed", f"{claimed}/100")
     c2.metric("Price", f"${settings['price_per_square']}")
     c3.metric("Board locked", "Yes" if settings["board_locked"] else "No")
@@ -547,38 +697,41 @@ def page_home(user: db.User | None):
     if flash:
         st.success(str(flash))
 
-    selected_ids = set(st.session_state.get("home_selected_square_ids", []))
-
-    my_ids = {int(s["id"]) for s in squares if user and s.get("owner_user_id") == user.id}
-    open_ids = {int(s["id"]) for s in squares if not s.get("owner_user_id")}
+    can_edit = bool(user) and (not settings["board_locked"])
 
-    def _toggle_select(sq_id: int) -> None:
-        sel = set(st.session_state.get("home_selected_square_ids", []))
-        if sq_id in sel:
-            sel.remove(sq_id)
-        else:
-            sel.add(sq_id)
-        st.session_state["home_selected_square_ids"] = sorted(sel)
-        st.rerun()
+    # Selection toggles only touch session_state, so the grid + summary live in
+    # a fragment: clicking a square reruns this section alone instead of the
+    # whole page (no load_state/winners/audit refetch per toggle). Submitting
+    # changes still triggers a full rerun so the rest of the page refreshes.
+    @_fragment
+    def _board_section() -> None:
+        selected_ids = set(st.session_state.get("home_selected_square_ids") or ())
+
+        def _toggle_select(sq_id: int) -> None:
+            # Stored as a set: O(1) toggle, no per-click sort/list round-trip.
+            sel = st.session_state.setdefault("home_selected_square_ids", set())
+            sel.symmetric_difference_update({sq_id})
+            _rerun_board()
+
+        render_board_grid(
+            squares=squares,
+            row_digits=row_digits,
+            col_digits=col_digits,
+            team_rows=str(settings["team_rows"] or "Away"),
+            team_columns=str(settings["team_columns"] or "Home"),
+            grid_key_prefix="home",
+            click_to_claim=False,
+            on_claim=lambda _sq_id: None,
+            selected_ids=selected_ids,
+            on_toggle_select=_toggle_select if can_edit else None,
+            allow_toggle_own=True,
+            highlight_user_id=user.id if user else None,
+            winning_squares=winning_squares,
+        )
 
-    can_edit = bool(user) and (not settings["board_locked"])
-    render_board_grid(
-        squares=squares,
-        row_digits=row_digits,
-        col_digits=col_digits,
-        team_rows=str(settings["team_rows"] or "Away"),
-        team_columns=str(settings["team_columns"] or "Home"),
-        grid_key_prefix="home",
-        click_to_claim=False,
-        on_claim=lambda _sq_id: None,
-        selected_ids=selected_ids,
-        on_toggle_select=_toggle_select if can_edit else None,
-        allow_toggle_own=True,
-        highlight_user_id=user.id if user else None,
-        winning_squares=winning_squares,
-    )
+        if not (can_edit and user):
+            return
 
-    if can_edit and user:
         selected_open = sorted([sq for sq in selected_ids if sq in open_ids])
         selected_mine = sorted([sq for sq in selected_ids if sq in my_ids])
         c1, c2, c3, c4 = st.columns([1.25, 1.15, 1, 1.2])
@@ -593,8 +746,8 @@ def page_home(user: db.User | None):
             disabled=(len(selected_ids) == 0),
             width="stretch",
         ):
-            st.session_state["home_selected_square_ids"] = []
-            st.rerun()
+            st.session_state["home_selected_square_ids"] = set()
+            _rerun_board()
 
         apply_disabled = (len(selected_open) == 0) and (len(selected_mine) == 0)
         if c4.button(
@@ -611,59 +764,46 @@ def page_home(user: db.User | None):
                 )
                 st.stop()
 
-            claimed_ids: list[int] = []
-            released_ids: list[int] = []
-            skipped: list[int] = []
-            skipped_due_to_limit: list[int] = []
             with db.db() as conn:
-                db.init_db(conn)
                 # Log selection intent (one row), not every click.
-                db.log_action(
-                    conn,
-                    user.id,
-                    "select_squares",
-                    {"claim": _audit_ids(selected_open), "release": _audit_ids(selected_mine)},
-                )
-                # Enforce the cap at write-time too.
-                current_owned_db = db.count_user_squares(conn, user.id)
+                audit_entries: list[tuple[str, dict]] = [
+                    (
+                        "select_squares",
+                        {"claim": _audit_ids(selected_open), "release": _audit_ids(selected_mine)},
+                    )
+                ]
+                # Enforce the cap at write-time too. len(my_ids) comes from the
+                # same snapshot the user acted on; claim_squares re-checks
+                # ownership in SQL, so the precheck is advisory and we skip a
+                # COUNT(*) round-trip inside the write transaction.
                 max_setting = max_boxes_per_user
                 if max_setting > 0:
-                    remaining_slots = max(0, max_setting - (current_owned_db - len(selected_mine)))
+                    remaining_slots = max(0, max_setting - (len(my_ids) - len(selected_mine)))
                 else:
-                    remaining_slots = 10_000
-
-                for sq_id in selected_open:
-                    if remaining_slots <= 0:
-                        skipped_due_to_limit.append(sq_id)
-                        continue
-                    owner = db.get_square_owner_user_id(conn, sq_id)
-                    if owner is not None:
-                        skipped.append(sq_id)
-                        continue
-                    db.set_square_owner(conn, sq_id, user.id)
-                    claimed_ids.append(sq_id)
-                    remaining_slots -= 1
-                for sq_id in selected_mine:
-                    owner = db.get_square_owner_user_id(conn, sq_id)
-                    if owner != user.id:
-                        skipped.append(sq_id)
-                        continue
-                    db.set_square_owner(conn, sq_id, None)
-                    released_ids.append(sq_id)
+                    remaining_slots = None
+
+                claimed_ids, skipped, skipped_due_to_limit = db.claim_squares(
+                    conn, user_id=user.id, square_ids=selected_open, limit=remaining_slots
+                )
+                released_ids, release_skipped = db.release_squares(
+                    conn, user_id=user.id, square_ids=selected_mine
+                )
+                skipped = skipped + release_skipped
                 if claimed_ids or released_ids:
-                    db.log_action(
-                        conn,
-                        user.id,
-                        "update_boxes",
-                        {
-                            "claimed": _audit_ids(claimed_ids),
-                            "released": _audit_ids(released_ids),
-                            "skipped": _audit_ids(skipped),
-                            "skipped_due_to_limit": _audit_ids(skipped_due_to_limit),
-                        },
+                    audit_entries.append(
+                        (
+                            "update_boxes",
+                            {
+                                "claimed": _audit_ids(claimed_ids),
+                                "released": _audit_ids(released_ids),
+                                "skipped": _audit_ids(skipped),
+                                "skipped_due_to_limit": _audit_ids(skipped_due_to_limit),
+                            },
+                        )
                     )
+                db.log_actions_many(conn, user.id, audit_entries)
 
-            st.session_state["home_selected_square_ids"] = []
+            st.session_state["home_selected_square_ids"] = set()
             msg = []
             if claimed_ids:
                 msg.append(f"claimed {len(claimed_ids)}")
@@ -677,47 +817,58 @@ def page_home(user: db.User | None):
             _invalidate_state_cache()
             st.rerun()
 
+    _board_section()
+
     st.subheader("Quarter winners")
     if not (row_digits and col_digits):
         st.caption("Winners show up after digits are assigned and scores are entered.")
     else:
-        with db.db() as conn:
-            winners = []
-            for q in (1, 2, 3, 4):
-                score = db.get_score(conn, q)
-                if score.get("updated_by_user_id") is None:
-                    continue
-                win_sq = game_logic.compute_winner_square_id(
-                    rows_score=int(score["rows_score"]),
-                    cols_score=int(score["cols_score"]),
-                    row_digits=row_digits,
-                    col_digits=col_digits,
-                )
-                win_owner = next((s.get("owner_display_name") for s in squares if int(s["id"]) == win_sq), None)
-                r, c = game_logic.row_col_from_id(win_sq)
-                winners.append(
-                    {
-                        "Quarter": q,
-                        settings["team_rows"]: int(score["rows_score"]),
-                        settings["team_columns"]: int(score["cols_score"]),
-                        "Winning square": f"R{r} C{c} (#{win_sq})",
-                        "Winner": win_owner or "(unclaimed)",
-                    }
-                )
-        if not winners:
+        # Reuse the scores fetched above; owner lookup is a dict probe instead
+        # of a 100-square linear scan per quarter.
+        owners_by_id = {int(s["id"]): s.get("owner_display_name") for s in squares}
+        # Columnar construction: pandas ingests dict-of-lists without per-row
+        # key normalization, and the score columns stay integer-typed.
+        quarters: list[int] = []
+        rows_scores: list[int] = []
+        cols_scores: list[int] = []
+        win_labels: list[str] = []
+        win_names: list[str] = []
+        for q in (1, 2, 3, 4):
+            score = scores_by_q.get(q)
+            if not score or q not in win_ids:
+                continue
+            win_sq = win_ids[q]
+            r, c = game_logic.row_col_from_id(win_sq)
+            quarters.append(q)
+            rows_scores.append(int(score["rows_score"]))
+            cols_scores.append(int(score["cols_score"]))
+            win_labels.append(f"R{r} C{c} (#{win_sq})")
+            win_names.append(owners_by_id.get(win_sq) or "(unclaimed)")
+        if not quarters:
             st.caption("No quarter scores entered yet.")
         else:
-            st.dataframe(pd.DataFrame(winners), width="stretch", hide_index=True)
+            n = len(quarters)
+            winners_df = pd.DataFrame(
+                {
+                    "Quarter": np.fromiter(quarters, dtype=np.int8, count=n),
+                    settings["team_rows"]: np.fromiter(rows_scores, dtype=np.int16, count=n),
+                    settings["team_columns"]: np.fromiter(cols_scores, dtype=np.int16, count=n),
+                    "Winning square": win_labels,
+                    "Winner": win_names,
+                }
+            )
+            st.dataframe(winners_df, width="stretch", hide_index=True)
 
     with st.expander("Recent activity", expanded=False):
-        with db.db() as conn:
-            rows = db.recent_audit(conn, limit=15)
+        # Streamlit executes a collapsed expander's body regardless, so the
+        # fetch is cached (short TTL, nonce-keyed for immediacy after own writes).
+        rows = _recent_audit_cached(int(st.session_state.get("_sb_state_nonce", 0)))
         if not rows:
             st.caption("No activity yet.")
         else:
             for r in rows:
                 actor = r["actor_display_name"] or "Someone"
-                details = json.loads(r["details_json"]) if r["details_json"] else {}
+                details = _json_loads(r["details_json"]) if r["details_json"] else {}
                 st.write(f"- {_ts_to_str(int(r['created_at_ts']))}: {actor} {r['action']} {details}")
 
 
@@ -745,70 +896,65 @@ def page_pick_boxes(user: db.User):
     st.subheader("Click-to-claim board")
     st.caption("Tap open squares (·) to select them, then hit Claim.")
 
-    selected_ids = set(st.session_state.get("selected_square_ids", []))
-
-    def _toggle_select(sq_id: int) -> None:
-        sel = set(st.session_state.get("selected_square_ids", []))
-        if sq_id in sel:
-            sel.remove(sq_id)
-        else:
-            sel.add(sq_id)
-        st.session_state["selected_square_ids"] = sorted(sel)
-        st.rerun()
-
-    render_board_grid(
-        squares=squares,
-        row_digits=row_digits,
-        col_digits=col_digits,
-        team_rows=settings["team_rows"],
-        team_columns=settings["team_columns"],
-        grid_key_prefix="claim",
-        click_to_claim=False,
-        on_claim=lambda _sq_id: None,
-        selected_ids=selected_ids,
-        on_toggle_select=_toggle_select,
-        allow_toggle_own=False,
-        highlight_user_id=user.id,
-    )
+    # Same fragment treatment as page_home: toggles rerun only the board.
+    @_fragment
+    def _claim_board_section() -> None:
+        selected_ids = set(st.session_state.get("selected_square_ids") or ())
+
+        def _toggle_select(sq_id: int) -> None:
+            sel = st.session_state.setdefault("selected_square_ids", set())
+            sel.symmetric_difference_update({sq_id})
+            _rerun_board()
+
+        render_board_grid(
+            squares=squares,
+            row_digits=row_digits,
+            col_digits=col_digits,
+            team_rows=settings["team_rows"],
+            team_columns=settings["team_columns"],
+            grid_key_prefix="claim",
+            click_to_claim=False,
+            on_claim=lambda _sq_id: None,
+            selected_ids=selected_ids,
+            on_toggle_select=_toggle_select,
+            allow_toggle_own=False,
+            highlight_user_id=user.id,
+        )
 
-    c1, c2, c3 = st.columns(3)
-    c1.metric("Selected", str(len(selected_ids)))
-    if c2.button("Clear selection", disabled=(len(selected_ids) == 0)):
-        st.session_state["selected_square_ids"] = []
-        st.rerun()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Selected", str(len(selected_ids)))
+        if c2.button("Clear selection", disabled=(len(selected_ids) == 0)):
+            st.session_state["selected_square_ids"] = set()
+            _rerun_board()
 
-    if c3.button("Claim selected", type="primary", disabled=(len(selected_ids) == 0)):
-        claimed: list[int] = []
-        already_taken: list[int] = []
-        with db.db() as conn:
-            db.init_db(conn)
-            db.log_action(conn, user.id, "select_squares", {"claim": _audit_ids(sorted(selected_ids)), "release": _audit_ids([])})
-            for sq_id in sorted(selected_ids):
-                owner = db.get_square_owner_user_id(conn, sq_id)
-                if owner is not None:
-                    already_taken.append(sq_id)
-                    continue
-                db.set_square_owner(conn, sq_id, user.id)
-                claimed.append(sq_id)
-            if claimed:
-                db.log_action(
-                    conn,
-                    user.id,
-                    "update_boxes",
-                    {"claimed": _audit_ids(claimed), "released": _audit_ids([]), "already_taken": _audit_ids(already_taken)},
+        if c3.button("Claim selected", type="primary", disabled=(len(selected_ids) == 0)):
+            with db.db() as conn:
+                audit_entries: list[tuple[str, dict]] = [
+                    ("select_squares", {"claim": _audit_ids(sorted(selected_ids)), "release": _audit_ids([])})
+                ]
+                claimed, already_taken, _ = db.claim_squares(conn, user_id=user.id, square_ids=sorted(selected_ids))
+                if claimed:
+                    audit_entries.append(
+                        (
+                            "update_boxes",
+                            {"claimed": _audit_ids(claimed), "released": _audit_ids([]), "already_taken": _audit_ids(already_taken)},
+                        )
+                    )
+                db.log_actions_many(conn, user.id, audit_entries)
+            st.session_state["selected_square_ids"] = set()
+            if claimed and not already_taken:
+                st.session_state["flash_message"] = f"Claimed {len(claimed)} square(s)."
+            elif claimed and already_taken:
+                st.session_state["flash_message"] = (
+                    f"Claimed {len(claimed)} square(s). {len(already_taken)} were already taken."
                 )
-        st.session_state["selected_square_ids"] = []
-        if claimed and not already_taken:
-            st.session_state["flash_message"] = f"Claimed {len(claimed)} square(s)."
-        elif claimed and already_taken:
-            st.session_state["flash_message"] = (
-                f"Claimed {len(claimed)} square(s). {len(already_taken)} were already taken."
-            )
-        else:
-            st.session_state["flash_message"] = "No squares were claimed (they were already taken)."
-        if claimed:
-            _invalidate_state_cache()
-        st.rerun()
+            else:
+                st.session_state["flash_message"] = "No squares were claimed (they were already taken)."
+            if claimed:
+                _invalidate_state_cache()
+            st.rerun()
+
+    _claim_board_section()
 
     st.caption("Claimed squares will show your name on the board right away.")
 
@@ -822,28 +968,33 @@ def page_my_boxes(user: db.User):
         st.info("You do not own any squares yet. Head to 'Claim squares'.")
         st.stop()
 
-    rows = []
+    labels = []
     for s in mine:
         r, c = game_logic.row_col_from_id(int(s["id"]))
-        rows.append({"Square": f"R{r} C{c} (#{s['id']})"})
-    st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True)
+        labels.append(f"R{r} C{c} (#{s['id']})")
+    st.dataframe(pd.DataFrame({"Square": labels}), width="stretch", hide_index=True)
 
     if row_digits and col_digits:
         st.subheader("What digits do I have?")
         st.caption(
             f"Rows use {settings['team_rows']} last-digit; columns use {settings['team_columns']} last-digit."
         )
-        enriched = []
+        sq_labels: list[str] = []
+        row_digit_col: list[int] = []
+        col_digit_col: list[int] = []
         for s in mine:
             r, c = game_logic.row_col_from_id(int(s["id"]))
-            enriched.append(
-                {
-                    "Square": f"R{r} C{c} (#{s['id']})",
-                    f"{settings['team_rows']} digit": row_digits[r],
-                    f"{settings['team_columns']} digit": col_digits[c],
-                }
-            )
-        st.dataframe(pd.DataFrame(enriched), width="stretch", hide_index=True)
+            sq_labels.append(f"R{r} C{c} (#{s['id']})")
+            row_digit_col.append(row_digits[r])
+            col_digit_col.append(col_digits[c])
+        enriched_df = pd.DataFrame(
+            {
+                "Square": sq_labels,
+                f"{settings['team_rows']} digit": np.fromiter(row_digit_col, dtype=np.int8, count=len(mine)),
+                f"{settings['team_columns']} digit": np.fromiter(col_digit_col, dtype=np.int8, count=len(mine)),
+            }
+        )
+        st.dataframe(enriched_df, width="stretch", hide_index=True)
 
     if settings["board_locked"]:
         st.info("Board is locked, so squares cannot be released.")
@@ -855,7 +1006,6 @@ def page_my_boxes(user: db.User):
     if st.button("Release it"):
         sq_id = int(pick.lstrip("#"))
         with db.db() as conn:
-            db.init_db(conn)
             owner = db.get_square_owner_user_id(conn, sq_id)
             if owner != user.id:
                 st.error("That square is not yours anymore.")
@@ -912,12 +1062,16 @@ def page_admin(user: db.User):
             submitted = st.form_submit_button("Save settings")
         if submitted:
             with db.db() as conn:
-                db.init_db(conn)
-                db.set_setting(conn, "team_rows", team_rows.strip() or "Away")
-                db.set_setting(conn, "team_columns", team_cols.strip() or "Home")
-                db.set_setting(conn, "price_per_square", str(int(price)))
-                db.set_setting(conn, "max_boxes_per_user", str(int(max_boxes)))
-                db.set_setting(conn, "board_locked", "1" if board_locked else "0")
+                db.set_settings_bulk(
+                    conn,
+                    {
+                        "team_rows": team_rows.strip() or "Away",
+                        "team_columns": team_cols.strip() or "Home",
+                        "price_per_square": str(int(price)),
+                        "max_boxes_per_user": str(int(max_boxes)),
+                        "board_locked": "1" if board_locked else "0",
+                    },
+                )
             st.success("Saved.")
             _invalidate_state_cache()
             st.rerun()
@@ -932,44 +1086,33 @@ def page_admin(user: db.User):
         c1, c2, c3 = st.columns(3)
         with c1:
             if st.button("Randomize rows + columns"):
-                digits = list(range(10))
-                rd = digits[:]
-                cd = digits[:]
-                random.shuffle(rd)
-                random.shuffle(cd)
+                rd = random.sample(_ALL_DIGITS, 10)
+                cd = random.sample(_ALL_DIGITS, 10)
                 with db.db() as conn:
-                    db.init_db(conn)
-                    db.set_setting(conn, "row_digits_json", game_logic.digits_to_json(rd))
-                    db.set_setting(conn, "col_digits_json", game_logic.digits_to_json(cd))
+                    db.set_settings_bulk(
+                        conn,
+                        {
+                            "row_digits_json": game_logic.digits_to_json(rd),
+                            "col_digits_json": game_logic.digits_to_json(cd),
+                        },
+                    )
                 st.success("Digits assigned.")
                 _invalidate_state_cache()
                 st.rerun()
         with c2:
             if st.button("Randomize rows only"):
-                digits = list(range(10))
-                rd = digits[:]
-                random.shuffle(rd)
-                cd = col_digits if col_digits else digits[:]
-                if not col_digits:
-                    random.shuffle(cd)
+                # Only the rows axis changes; leave col_digits_json untouched
+                # (winners stay hidden until both axes are assigned anyway).
+                rd = random.sample(_ALL_DIGITS, 10)
                 with db.db() as conn:
-                    db.init_db(conn)
                     db.set_setting(conn, "row_digits_json", game_logic.digits_to_json(rd))
-                    db.set_setting(conn, "col_digits_json", game_logic.digits_to_json(cd))
                 st.success("Rows digits randomized.")
                 _invalidate_state_cache()
                 st.rerun()
         with c3:
             if st.button("Randomize columns only"):
-                digits = list(range(10))
-                cd = digits[:]
-                random.shuffle(cd)
-                rd = row_digits if row_digits else digits[:]
-                if not row_digits:
-                    random.shuffle(rd)
+                cd = random.sample(_ALL_DIGITS, 10)
                 with db.db() as conn:
-                    db.init_db(conn)
-                    db.set_setting(conn, "row_digits_json", game_logic.digits_to_json(rd))
                     db.set_setting(conn, "col_digits_json", game_logic.digits_to_json(cd))
                 st.success("Columns digits randomized.")
                 _invalidate_state_cache()
@@ -979,9 +1122,7 @@ def page_admin(user: db.User):
 
         if st.button("Clear digits", type="secondary"):
             with db.db() as conn:
-                db.init_db(conn)
-                db.set_setting(conn, "row_digits_json", "")
-                db.set_setting(conn, "col_digits_json", "")
+                db.set_settings_bulk(conn, {"row_digits_json": "", "col_digits_json": ""})
             st.success("Cleared.")
             _invalidate_state_cache()
             st.rerun()
@@ -999,7 +1140,6 @@ def page_admin(user: db.User):
             submitted = st.form_submit_button("Save score")
         if submitted:
             with db.db() as conn:
-                db.init_db(conn)
                 db.set_score(
                     conn,
                     quarter=int(quarter),
@@ -1019,25 +1159,22 @@ def page_admin(user: db.User):
             with db.db() as conn:
                 users = db.list_users_basic(conn)
             user_map = {int(u["id"]): str(u["display_name"]) for u in users}
-            sq = st.selectbox(
+            # Options are plain ids rendered via format_func, so the submit
+            # handler never has to parse ids back out of display strings
+            # (which also broke for display names containing '#' or 'id=').
+            taken_labels = {int(s["id"]): f"#{int(s['id'])} ({s.get('owner_display_name')})" for s in taken}
+            sq_id = st.selectbox(
                 "Pick a claimed square",
-                [f"#{int(s['id'])} ({s.get('owner_display_name')})" for s in taken],
+                list(taken_labels),
+                format_func=taken_labels.get,
             )
-            new_owner = st.selectbox(
+            owner_id = st.selectbox(
                 "Reassign to",
-                ["(unclaimed)"]
-                + [
-                    f"{name} (id={uid})"
-                    for uid, name in sorted(user_map.items(), key=lambda x: x[1].lower())
-                ],
+                [None] + sorted(user_map, key=lambda uid: user_map[uid].lower()),
+                format_func=lambda uid: "(unclaimed)" if uid is None else f"{user_map[uid]} (id={uid})",
             )
             if st.button("Reassign square"):
-                sq_id = int(sq.split()[0].lstrip("#"))
-                owner_id = None
-                if new_owner != "(unclaimed)":
-                    owner_id = int(new_owner.split("id=")[-1].rstrip(")"))
                 with db.db() as conn:
-                    db.init_db(conn)
                     prev_owner = db.get_square_owner_user_id(conn, sq_id)
                     db.set_square_owner(conn, sq_id, owner_id)
                     db.log_action(
@@ -1054,7 +1191,6 @@ def page_admin(user: db.User):
         st.caption("Use this if you want to reuse the app next year without deleting accounts.")
         if st.button("Reset squares + scores", type="secondary"):
             with db.db() as conn:
-                db.init_db(conn)
                 db.reset_board_keep_users(conn)
                 db.log_action(conn, user.id, "update_boxes", {"reset_board": True})
             st.success("Reset complete.")
@@ -1075,17 +1211,23 @@ def page_admin(user: db.User):
                 except Exception:
                     pass
 
-                try:
-                    raw = db_file.read_bytes()
-                    st.download_button(
-                        "Download DB backup",
-                        data=raw,
-                        file_name="squares.db",
-                        mime="application/x-sqlite3",
-                        width="stretch",
-                    )
-                except Exception:
-                    st.warning("Could not read DB file for download (permissions?).")
+                # Only read the DB into memory once the admin asks for a
+                # backup; the unconditional read_bytes() was an O(DB size)
+                # copy on every admin-page rerun.
+                if st.checkbox("Prepare backup for download", value=False, key="admin_prepare_backup"):
+                    try:
+                        with db.db() as conn:
+                            db.checkpoint_wal(conn)
+                        raw = db_file.read_bytes()
+                        st.download_button(
+                            "Download DB backup",
+                            data=raw,
+                            file_name="squares.db",
+                            mime="application/x-sqlite3",
+                            width="stretch",
+                        )
+                    except Exception:
+                        st.warning("Could not read DB file for download (permissions?).")
             else:
                 st.info("DB file not found yet (it will be created automatically on first use).")
 
@@ -1103,7 +1245,6 @@ def page_admin(user: db.User):
             keep_audit = st.number_input("Keep last N audit rows", min_value=0, max_value=50000, value=500, step=50)
             if st.button("Prune audit log", width="stretch"):
                 with db.db() as conn:
-                    db.init_db(conn)
                     db.prune_audit_log(conn, keep_last=int(keep_audit))
                 st.success("Audit log pruned.")
                 st.rerun()
@@ -1116,9 +1257,15 @@ def page_admin(user: db.User):
             confirm = st.text_input("Type RESET to confirm", value="", placeholder="RESET")
             if st.button("Delete DB file and recreate", type="primary", disabled=(confirm.strip() != "RESET")):
                 # Clear session so we don't keep a stale user_id.
-                for k in ("user_id", "nav_page", "home_selected_square_ids", "selected_square_ids", "_sb_bootstrap_done"):
+                for k in ("user_id", "nav_page", "home_selected_square_ids", "selected_square_ids"):
                     st.session_state.pop(k, None)
 
+                # Release the shared connection before unlinking the file, and
+                # forget the once-per-process bootstrap so the schema is
+                # recreated on the next run.
+                db.close_shared_conn()
+                _bootstrap.clear()
+
                 paths = [db_file]
                 for suffix in ("-wal", "-shm", "-journal"):
                     paths.append(Path(str(db_file) + suffix))
@@ -1191,6 +1338,7 @@ def page_admin(user: db.User):
                     released = db.delete_user_and_cleanup(conn, user_id=target_id)
                     db.log_action(conn, user.id, "update_boxes", {"admin_deleted_user_id": int(target_id), "released_squares": int(released)})
                 st.success(f"Deleted user. Released {released} square(s).")
+                _load_user_cached.clear()
                 _invalidate_state_cache()
                 st.rerun()
 
@@ -1200,14 +1348,15 @@ def page_admin(user: db.User):
                 st.caption("Deleting your own account is disabled.")
 
 
-def main():
-    # Local dev convenience: load `superbowl_squares/.env` if present.
+@st.cache_resource(show_spinner=False)
+def _wire_env() -> bool:
+    # .env loading and the secrets → env bridge are pure process setup; the
+    # st.secrets accessor stats .streamlit/secrets.toml, so keep this off the
+    # per-rerun path.
     if load_dotenv:
+        # Local dev convenience: load `superbowl_squares/.env` if present.
         load_dotenv(Path(__file__).resolve().parent / ".env")
 
-    st.set_page_config(page_title="Super Bowl Squares", layout="wide")
-    st.markdown(_GLOBAL_CSS, unsafe_allow_html=True)
-
     # Streamlit secrets → env bridge (so `db.py` can read DATABASE_URL / admin creds).
     try:
         secrets = st.secrets  # type: ignore[attr-defined]
@@ -1225,18 +1374,21 @@ def main():
                 os.environ.setdefault(key, str(secrets[key]))
     except Exception:
         pass
+    return True
 
-    # Initialize DB once per session (schema + admin bootstrap).
-    if not st.session_state.get("_sb_bootstrap_done"):
-        with db.db() as conn:
-            db.init_db(conn)
-            db.ensure_admin_from_env(conn)
-        st.session_state["_sb_bootstrap_done"] = True
+
+def main():
+    _wire_env()
+
+    st.set_page_config(page_title="Super Bowl Squares", layout="wide")
+    _inject_global_css()
+
+    # Initialize DB once per process (schema + admin bootstrap).
+    _bootstrap()
 
     user = None
     if st.session_state.get("user_id"):
-        with db.db() as conn:
-            user = db.get_user(conn, int(st.session_state["user_id"]))
+        user = _load_user_cached(int(st.session_state["user_id"]))
 
     # Auth-first: if you're not signed in, go straight to Sign in / Register.
     if not user:
@@ -3,13 +3,20 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterator
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
+try:  # Optional: faster JSON encoding for audit payloads.
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
 try:  # Optional: only required when using Postgres/Neon.
     from sqlalchemy import create_engine, text
     from sqlalchemy.engine import Engine
@@ -29,16 +36,42 @@ DEFAULT_SETTINGS: dict[str, str] = {
     "row_digits_json": "",
     "col_digits_json": "",
     "max_boxes_per_user": "0",
+    "board_version": "0",
 }
 
 _DB_PATH_CACHE: Path | None = None
 _ENGINE_CACHE: Engine | None = None
+_SQLITE_CONN_CACHE: sqlite3.Connection | None = None
+# Streamlit serves each session from its own thread; the shared connection is
+# opened with check_same_thread=False and transactions are serialized here.
+_SQLITE_LOCK = threading.Lock()
+
+_SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-8000;
+PRAGMA mmap_size=67108864;
+PRAGMA busy_timeout=5000;
+"""
+
+# Periodic `PRAGMA optimize` cadence (seconds). SQLite recommends running it
+# every few hours of use; every 15 minutes is plenty at this app's write rate
+# and each call is cheap when there is nothing to do.
+_OPTIMIZE_INTERVAL_SECS = 900.0
+_LAST_OPTIMIZE_TS = 0.0
 
 
 def _now_ts() -> int:
     return int(time.time())
 
 
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def db_path() -> Path:
     global _DB_PATH_CACHE
     if _DB_PATH_CACHE is not None:
@@ -86,9 +119,31 @@ def connect() -> sqlite3.Connection:
     path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.executescript(_SQLITE_PRAGMAS)
     return conn
 
 
+def _shared_sqlite_conn() -> sqlite3.Connection:
+    global _SQLITE_CONN_CACHE
+    if _SQLITE_CONN_CACHE is None:
+        _SQLITE_CONN_CACHE = connect()
+    return _SQLITE_CONN_CACHE
+
+
+def close_shared_conn() -> None:
+    """Close the cached SQLite connection (e.g. before deleting the DB file)."""
+    global _SQLITE_CONN_CACHE
+    with _SQLITE_LOCK:
+        if _SQLITE_CONN_CACHE is not None:
+            try:
+                _SQLITE_CONN_CACHE.close()
+            except Exception:
+                pass
+            _SQLITE_CONN_CACHE = None
+    _SETTINGS_CACHE.clear()
+    _USER_NAME_CACHE.clear()
+
+
 @contextmanager
 def db() -> Iterator[Any]:
     if database_url():
@@ -97,21 +152,59 @@ def db() -> Iterator[Any]:
             yield conn
         return
 
-    conn = connect()
+    # Reuse one connection per process: avoids open/close + pragma setup per
+    # rerun and keeps SQLite's page cache warm. The lock serializes sessions.
+    with _SQLITE_LOCK:
+        conn = _shared_sqlite_conn()
+        try:
+            yield conn
+            conn.commit()
+            _maybe_optimize(conn)
+        except Exception:
+            conn.rollback()
+            # Reads done inside the failed transaction may have populated the
+            # in-process caches with now-rolled-back values.
+            _SETTINGS_CACHE.clear()
+            _USER_NAME_CACHE.clear()
+            raise
+
+
+def _maybe_optimize(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics periodically, outside the admin VACUUM."""
+    global _LAST_OPTIMIZE_TS
+    now = time.monotonic()
+    if now - _LAST_OPTIMIZE_TS < _OPTIMIZE_INTERVAL_SECS and _LAST_OPTIMIZE_TS:
+        return
+    _LAST_OPTIMIZE_TS = now
     try:
-        yield conn
-        conn.commit()
-    finally:
-        conn.close()
+        conn.execute("PRAGMA optimize")
+    except Exception:
+        pass
+
+
+# Memoized on first use rather than at import: the module is imported before
+# app.py has bridged Streamlit secrets into os.environ, so an import-time
+# read would miss a configured DATABASE_URL. `False` doubles as "not yet
+# resolved" sentinel (a resolved value is always str or None).
+_DATABASE_URL_CACHE: str | None | bool = False
 
 
 def database_url() -> str | None:
-    return (
-        os.getenv("DATABASE_URL")
-        or os.getenv("NEON_DATABASE_URL")
-        or os.getenv("POSTGRES_URL")
-        or os.getenv("POSTGRES_URL_NON_POOLING")
-    )
+    global _DATABASE_URL_CACHE
+    if _DATABASE_URL_CACHE is False:
+        _DATABASE_URL_CACHE = (
+            os.getenv("DATABASE_URL")
+            or os.getenv("NEON_DATABASE_URL")
+            or os.getenv("POSTGRES_URL")
+            or os.getenv("POSTGRES_URL_NON_POOLING")
+        )
+    return _DATABASE_URL_CACHE  # type: ignore[return-value]
+
+
+def _reset_env_cache() -> None:
+    """Forget the memoized DATABASE_URL (tests / env changes)."""
+    global _DATABASE_URL_CACHE
+    _DATABASE_URL_CACHE = False
 
 
 def using_postgres() -> bool:
@@ -145,32 +238,54 @@ def _get_engine() -> Engine:
     url = database_url()
     if not url:
         raise RuntimeError("No DATABASE_URL configured.")
-    _ENGINE_CACHE = create_engine(_normalize_database_url(url), pool_pre_ping=True)
+    # The engine's built-in pool keeps TLS connections warm between reruns
+    # (a fresh Neon connect costs ~50-200ms). Recycle before Neon's idle
+    # timeout so we hand out live connections instead of relying on the
+    # pre-ping to discover dead ones.
+    _ENGINE_CACHE = create_engine(
+        _normalize_database_url(url),
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=5,
+        pool_recycle=300,
+    )
     return _ENGINE_CACHE
 
 
 def _is_sqlite_conn(conn: Any) -> bool:
-    return isinstance(conn, sqlite3.Connection)
+    # Exact type check: connect() always returns a plain sqlite3.Connection
+    # (the C type rejects attribute writes, so a bound backend flag isn't an
+    # option), and `type(x) is T` skips isinstance's subclass walk on a
+    # helper that runs for every statement.
+    return type(conn) is sqlite3.Connection
+
+
+@lru_cache(maxsize=256)
+def _compiled(sql: str):
+    """Reuse one TextClause per SQL string; the statement set is small and
+    fixed, so hot queries skip re-construction (and keep a stable cache key
+    for SQLAlchemy's compiled-statement cache)."""
+    return text(sql)
 
 
 def _execute(conn: Any, sql: str, params: dict[str, Any] | None = None) -> Any:
     if _is_sqlite_conn(conn):
         return conn.execute(sql, params or {})
-    return conn.execute(text(sql), params or {})
+    return conn.execute(_compiled(sql), params or {})
 
 
 def _fetchone(conn: Any, sql: str, params: dict[str, Any] | None = None) -> dict[str, Any] | None:
     if _is_sqlite_conn(conn):
         row = conn.execute(sql, params or {}).fetchone()
         return dict(row) if row else None
-    row = conn.execute(text(sql), params or {}).mappings().fetchone()
+    row = conn.execute(_compiled(sql), params or {}).mappings().fetchone()
     return dict(row) if row else None
 
 
 def _fetchall(conn: Any, sql: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
     if _is_sqlite_conn(conn):
         return [dict(r) for r in conn.execute(sql, params or {}).fetchall()]
-    return [dict(r) for r in conn.execute(text(sql), params or {}).mappings().fetchall()]
+    return [dict(r) for r in conn.execute(_compiled(sql), params or {}).mappings().fetchall()]
 
 
 def init_db(conn: Any) -> None:
@@ -217,6 +332,17 @@ def init_db(conn: Any) -> None:
               details_json TEXT NOT NULL,
               FOREIGN KEY(actor_user_id) REFERENCES users(id)
             );
+
+            CREATE TABLE IF NOT EXISTS login_attempts (
+              key TEXT PRIMARY KEY,
+              tokens REAL NOT NULL,
+              last_ts REAL NOT NULL
+            );
+
+            -- FK columns used by the list_squares / recent_audit JOINs.
+            -- (users.username is already indexed via its UNIQUE constraint.)
+            CREATE INDEX IF NOT EXISTS idx_squares_owner ON squares(owner_user_id);
+            CREATE INDEX IF NOT EXISTS idx_audit_actor ON audit_log(actor_user_id);
             """
         )
     else:
@@ -279,74 +405,120 @@ def init_db(conn: Any) -> None:
             """,
         )
 
-    # Pre-populate 100 squares if empty
-    existing_row = _fetchone(conn, "SELECT COUNT(*) AS c FROM squares")
-    existing = int(existing_row["c"]) if existing_row else 0
-    if existing == 0:
-        now = _now_ts()
-        if _is_sqlite_conn(conn):
-            conn.executemany(
-                "INSERT INTO squares (id, owner_user_id, updated_at_ts) VALUES (:id, NULL, :ts)",
-                [{"id": i, "ts": now} for i in range(100)],
+        _execute(
+            conn,
+            """
+            CREATE TABLE IF NOT EXISTS login_attempts (
+              key TEXT PRIMARY KEY,
+              tokens DOUBLE PRECISION NOT NULL,
+              last_ts DOUBLE PRECISION NOT NULL
             )
-        else:
-            for i in range(100):
-                _execute(
-                    conn,
-                    """
-                    INSERT INTO squares (id, owner_user_id, updated_at_ts)
-                    VALUES (:id, NULL, :ts)
-                    ON CONFLICT (id) DO NOTHING
-                    """,
-                    {"id": i, "ts": now},
-                )
+            """,
+        )
+        _execute(conn, "CREATE INDEX IF NOT EXISTS idx_squares_owner ON squares(owner_user_id)")
+        _execute(conn, "CREATE INDEX IF NOT EXISTS idx_audit_actor ON audit_log(actor_user_id)")
 
-    # Ensure default settings exist
-    now = _now_ts()
-    for k, v in DEFAULT_SETTINGS.items():
+    # Pre-populate 100 squares if empty (existence probe, same pattern as
+    # any_users_exist — no COUNT scan).
+    if not _fetchone(conn, "SELECT 1 AS ok FROM squares LIMIT 1"):
+        now = _now_ts()
         if _is_sqlite_conn(conn):
+            # One statement (and one WAL commit) for the whole board.
+            values = ",".join(f"({i}, NULL, :ts)" for i in range(100))
             conn.execute(
-                "INSERT OR IGNORE INTO settings (key, value, updated_at_ts) VALUES (:k, :v, :ts)",
-                {"k": k, "v": v, "ts": now},
+                f"INSERT INTO squares (id, owner_user_id, updated_at_ts) VALUES {values}",
+                {"ts": now},
             )
         else:
+            # One round-trip instead of 100 — dominant at cold start on Neon.
+            values = ",".join(f"({i}, NULL, :ts)" for i in range(100))
             _execute(
                 conn,
-                """
-                INSERT INTO settings (key, value, updated_at_ts)
-                VALUES (:k, :v, :ts)
-                ON CONFLICT (key) DO NOTHING
+                f"""
+                INSERT INTO squares (id, owner_user_id, updated_at_ts)
+                VALUES {values}
+                ON CONFLICT (id) DO NOTHING
                 """,
-                {"k": k, "v": v, "ts": now},
+                {"ts": now},
             )
 
+    # Ensure default settings exist
+    now = _now_ts()
+    if _is_sqlite_conn(conn):
+        values = ",".join(f"(:k{i}, :v{i}, :ts)" for i in range(len(DEFAULT_SETTINGS)))
+        params: dict[str, Any] = {"ts": now}
+        for i, (k, v) in enumerate(DEFAULT_SETTINGS.items()):
+            params[f"k{i}"] = k
+            params[f"v{i}"] = v
+        conn.execute(
+            f"INSERT OR IGNORE INTO settings (key, value, updated_at_ts) VALUES {values}",
+            params,
+        )
+    else:
+        values = ",".join(f"(:k{i}, :v{i}, :ts)" for i in range(len(DEFAULT_SETTINGS)))
+        params = {"ts": now}
+        for i, (k, v) in enumerate(DEFAULT_SETTINGS.items()):
+            params[f"k{i}"] = k
+            params[f"v{i}"] = v
+        _execute(
+            conn,
+            f"""
+            INSERT INTO settings (key, value, updated_at_ts)
+            VALUES {values}
+            ON CONFLICT (key) DO NOTHING
+            """,
+            params,
+        )
+
     # Seed score rows for quarters 1-4
-    for q in (1, 2, 3, 4):
-        if _is_sqlite_conn(conn):
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO scores (quarter, rows_score, cols_score, updated_at_ts, updated_by_user_id)
-                VALUES (:q, 0, 0, :ts, NULL)
-                """,
-                {"q": q, "ts": now},
-            )
-        else:
-            _execute(
-                conn,
-                """
-                INSERT INTO scores (quarter, rows_score, cols_score, updated_at_ts, updated_by_user_id)
-                VALUES (:q, 0, 0, :ts, NULL)
-                ON CONFLICT (quarter) DO NOTHING
-                """,
-                {"q": q, "ts": now},
-            )
+    if _is_sqlite_conn(conn):
+        values = ",".join(f"({q}, 0, 0, :ts, NULL)" for q in (1, 2, 3, 4))
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO scores (quarter, rows_score, cols_score, updated_at_ts, updated_by_user_id)
+            VALUES {values}
+            """,
+            {"ts": now},
+        )
+    else:
+        values = ",".join(f"({q}, 0, 0, :ts, NULL)" for q in (1, 2, 3, 4))
+        _execute(
+            conn,
+            f"""
+            INSERT INTO scores (quarter, rows_score, cols_score, updated_at_ts, updated_by_user_id)
+            VALUES {values}
+            ON CONFLICT (quarter) DO NOTHING
+            """,
+            {"ts": now},
+        )
+
+
+# In-process cache for the handful of settings read on every render. SQLite
+# only: this process owns the file (shared connection), so the writer-side
+# invalidations below are complete. Postgres may have other writers, so it
+# always hits the DB.
+_SETTINGS_CACHE: dict[str, str] = {}
 
 
 def get_setting(conn: Any, key: str) -> str:
+    use_cache = _is_sqlite_conn(conn)
+    if use_cache and key in _SETTINGS_CACHE:
+        return _SETTINGS_CACHE[key]
     row = _fetchone(conn, "SELECT value FROM settings WHERE key = :key", {"key": key})
-    if not row:
-        return DEFAULT_SETTINGS.get(key, "")
-    return str(row["value"])
+    value = str(row["value"]) if row else DEFAULT_SETTINGS.get(key, "")
+    if use_cache:
+        _SETTINGS_CACHE[key] = value
+    return value
+
+
+def get_all_settings(conn: Any) -> dict[str, str]:
+    """Every settings row in one query, merged over the defaults."""
+    merged = dict(DEFAULT_SETTINGS)
+    for r in _fetchall(conn, "SELECT key, value FROM settings"):
+        merged[str(r["key"])] = str(r["value"])
+    if _is_sqlite_conn(conn):
+        _SETTINGS_CACHE.update(merged)
+    return merged
 
 
 def set_setting(conn: Any, key: str, value: str) -> None:
@@ -359,6 +531,58 @@ def set_setting(conn: Any, key: str, value: str) -> None:
         """,
         {"key": key, "value": value, "ts": _now_ts()},
     )
+    _SETTINGS_CACHE.pop(key, None)
+    if key != "board_version":
+        bump_board_version(conn)
+
+
+def set_settings_bulk(conn: Any, mapping: dict[str, str]) -> None:
+    """Upsert several settings in one multi-row statement.
+
+    One parse + one constraint pass instead of a statement per key, and the
+    board version is bumped once for the whole batch.
+    """
+    if not mapping:
+        return
+    ts = _now_ts()
+    values_sql = []
+    params: dict[str, Any] = {"ts": ts}
+    for i, (key, value) in enumerate(mapping.items()):
+        values_sql.append(f"(:k{i}, :v{i}, :ts)")
+        params[f"k{i}"] = key
+        params[f"v{i}"] = value
+    _execute(
+        conn,
+        f"""
+        INSERT INTO settings (key, value, updated_at_ts)
+        VALUES {", ".join(values_sql)}
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at_ts = excluded.updated_at_ts
+        """,
+        params,
+    )
+    for key in mapping:
+        _SETTINGS_CACHE.pop(key, None)
+    bump_board_version(conn)
+
+
+def bump_board_version(conn: Any) -> None:
+    """Increment the monotonic board version used as the UI cache key.
+
+    Called from every write path so cached reads can key on a single setting
+    instead of scanning MAX(updated_at_ts) across tables.
+    """
+    _execute(
+        conn,
+        """
+        INSERT INTO settings (key, value, updated_at_ts)
+        VALUES ('board_version', '1', :ts)
+        ON CONFLICT(key) DO UPDATE
+        SET value = CAST(CAST(settings.value AS INTEGER) + 1 AS TEXT),
+            updated_at_ts = excluded.updated_at_ts
+        """,
+        {"ts": _now_ts()},
+    )
+    _SETTINGS_CACHE.pop("board_version", None)
 
 
 def log_action(conn: Any, actor_user_id: int | None, action: str, details: dict[str, Any]) -> None:
@@ -369,11 +593,64 @@ def log_action(conn: Any, actor_user_id: int | None, action: str, details: dict[
             "ts": _now_ts(),
             "actor": actor_user_id,
             "action": action,
-            "details": json.dumps(details, separators=(",", ":")),
+            "details": _json_dumps(details),
         },
     )
 
 
+# Sign-in rate limit: burst of 5 attempts, one token refilled every 12 seconds.
+_LOGIN_BUCKET_CAPACITY = 5.0
+_LOGIN_BUCKET_REFILL_PER_SEC = 1.0 / 12.0
+
+
+def check_login_rate(conn: Any, key: str) -> bool:
+    """Token-bucket rate limit for sign-in attempts; returns True if allowed.
+
+    Keys are per username+client so a stuffing run can't burn CPU on the KDF.
+    """
+    now = float(time.time())
+    row = _fetchone(conn, "SELECT tokens, last_ts FROM login_attempts WHERE key = :key", {"key": key})
+    if row is None:
+        tokens = _LOGIN_BUCKET_CAPACITY
+    else:
+        refill = (now - float(row["last_ts"])) * _LOGIN_BUCKET_REFILL_PER_SEC
+        tokens = min(_LOGIN_BUCKET_CAPACITY, float(row["tokens"]) + max(0.0, refill))
+    allowed = tokens >= 1.0
+    if allowed:
+        tokens -= 1.0
+    _execute(
+        conn,
+        """
+        INSERT INTO login_attempts (key, tokens, last_ts)
+        VALUES (:key, :tokens, :ts)
+        ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, last_ts = excluded.last_ts
+        """,
+        {"key": key, "tokens": tokens, "ts": now},
+    )
+    return allowed
+
+
+def log_actions_many(conn: Any, actor_user_id: int | None, entries: list[tuple[str, dict[str, Any]]]) -> None:
+    """Insert several audit rows for one actor with a single prepared statement."""
+    if not entries:
+        return
+    now = _now_ts()
+    rows = [
+        {
+            "ts": now,
+            "actor": actor_user_id,
+            "action": action,
+            "details": _json_dumps(details),
+        }
+        for action, details in entries
+    ]
+    sql = "INSERT INTO audit_log (created_at_ts, actor_user_id, action, details_json) VALUES (:ts, :actor, :action, :details)"
+    if _is_sqlite_conn(conn):
+        conn.executemany(sql, rows)
+    else:
+        conn.execute(_compiled(sql), rows)
+
+
 @dataclass(frozen=True)
 class User:
     id: int
@@ -428,6 +705,8 @@ def create_user(
             """,
             {**params, "is_admin": int(bool(is_admin))},
         )
+        _USER_NAME_CACHE.clear()
+        bump_board_version(conn)
         return int(cur.lastrowid)
 
     row = _fetchone(
@@ -441,27 +720,146 @@ def create_user(
     )
     if not row:
         raise RuntimeError("Failed to create user.")
+    _USER_NAME_CACHE.clear()
+    bump_board_version(conn)
     return int(row["id"])
 
 
+# user_id -> display_name, warmed lazily from list_users_basic. SQLite only,
+# for the same single-writer-process reason as _SETTINGS_CACHE; cleared on
+# any user create/update/delete and in close_shared_conn.
+_USER_NAME_CACHE: dict[int, str] = {}
+
+
+def _user_names(conn: Any) -> dict[int, str]:
+    if not _USER_NAME_CACHE:
+        for r in list_users_basic(conn):
+            _USER_NAME_CACHE[int(r["id"])] = str(r["display_name"])
+    return _USER_NAME_CACHE
+
+
 def list_squares(conn: Any) -> list[dict[str, Any]]:
-    return _fetchall(
+    if not _is_sqlite_conn(conn):
+        # Remote DB: one joined round-trip beats two queries.
+        return _fetchall(
+            conn,
+            """
+            SELECT s.id, s.owner_user_id, s.updated_at_ts, u.display_name AS owner_display_name
+            FROM squares s
+            LEFT JOIN users u ON u.id = s.owner_user_id
+            ORDER BY s.id
+            """,
+        )
+    # Local SQLite: attach names from the in-process cache instead of joining
+    # users on every board read.
+    names = _user_names(conn)
+    rows = list_squares_raw(conn)
+    for r in rows:
+        owner = r["owner_user_id"]
+        r["owner_display_name"] = names.get(owner) if owner is not None else None
+    return rows
+
+
+def list_squares_raw(conn: Any) -> list[dict[str, Any]]:
+    """Board ownership without the users JOIN.
+
+    For callers that only need ids and owner_user_id (cap checks, counts) —
+    use list_squares when owner display names are rendered.
+    """
+    return _fetchall(conn, "SELECT id, owner_user_id, updated_at_ts FROM squares ORDER BY id")
+
+
+def set_square_owner(conn: Any, square_id: int, owner_user_id: int | None) -> None:
+    # Null-safe no-op guard: a repeated reassign click (same owner) skips the
+    # write entirely, so no WAL frame and no board_version bump.
+    cursor = _execute(
         conn,
         """
-        SELECT s.id, s.owner_user_id, s.updated_at_ts, u.display_name AS owner_display_name
-        FROM squares s
-        LEFT JOIN users u ON u.id = s.owner_user_id
-        ORDER BY s.id
+        UPDATE squares SET owner_user_id = :owner, updated_at_ts = :ts
+        WHERE id = :id AND owner_user_id IS DISTINCT FROM :owner
         """,
+        {"owner": owner_user_id, "ts": _now_ts(), "id": square_id},
     )
+    if cursor.rowcount:
+        bump_board_version(conn)
 
 
-def set_square_owner(conn: Any, square_id: int, owner_user_id: int | None) -> None:
-    _execute(
+def _in_params(ids: list[int], prefix: str = "id") -> tuple[str, dict[str, int]]:
+    placeholders = ",".join(f":{prefix}{i}" for i in range(len(ids)))
+    return placeholders, {f"{prefix}{i}": int(v) for i, v in enumerate(ids)}
+
+
+def claim_squares(
+    conn: Any, *, user_id: int, square_ids: list[int], limit: int | None = None
+) -> tuple[list[int], list[int], list[int]]:
+    """Claim open squares in one batched UPDATE.
+
+    Returns (claimed, taken, dropped_by_limit). `limit` caps how many claims are
+    attempted (per-user box cap). The UPDATE re-checks `owner_user_id IS NULL`,
+    so squares grabbed concurrently end up in `taken` rather than overwritten.
+    """
+    requested = [int(x) for x in square_ids]
+    if not requested:
+        return [], [], []
+    placeholders, params = _in_params(requested)
+    open_rows = _fetchall(
         conn,
-        "UPDATE squares SET owner_user_id = :owner, updated_at_ts = :ts WHERE id = :id",
-        {"owner": owner_user_id, "ts": _now_ts(), "id": square_id},
+        f"SELECT id FROM squares WHERE id IN ({placeholders}) AND owner_user_id IS NULL ORDER BY id",
+        params,
     )
+    open_ids = [int(r["id"]) for r in open_rows]
+    if limit is not None:
+        dropped = open_ids[max(0, int(limit)):]
+        open_ids = open_ids[: max(0, int(limit))]
+    else:
+        dropped = []
+
+    claimed: list[int] = []
+    if open_ids:
+        placeholders, params = _in_params(open_ids)
+        rows = _fetchall(
+            conn,
+            f"""
+            UPDATE squares SET owner_user_id = :owner, updated_at_ts = :ts
+            WHERE id IN ({placeholders}) AND owner_user_id IS NULL
+            RETURNING id
+            """,
+            {**params, "owner": int(user_id), "ts": _now_ts()},
+        )
+        claimed = sorted(int(r["id"]) for r in rows)
+        if claimed:
+            bump_board_version(conn)
+
+    claimed_set = set(claimed)
+    dropped_set = set(dropped)
+    taken = [i for i in requested if i not in claimed_set and i not in dropped_set]
+    return claimed, taken, dropped
+
+
+def release_squares(conn: Any, *, user_id: int, square_ids: list[int]) -> tuple[list[int], list[int]]:
+    """Release the caller's squares in one batched UPDATE.
+
+    Returns (released, skipped); squares no longer owned by the caller are skipped.
+    """
+    requested = [int(x) for x in square_ids]
+    if not requested:
+        return [], []
+    placeholders, params = _in_params(requested)
+    rows = _fetchall(
+        conn,
+        f"""
+        UPDATE squares SET owner_user_id = NULL, updated_at_ts = :ts
+        WHERE id IN ({placeholders}) AND owner_user_id = :uid
+        RETURNING id
+        """,
+        {**params, "uid": int(user_id), "ts": _now_ts()},
+    )
+    released = sorted(int(r["id"]) for r in rows)
+    if released:
+        bump_board_version(conn)
+    released_set = set(released)
+    skipped = [i for i in requested if i not in released_set]
+    return released, skipped
 
 
 def get_score(conn: Any, quarter: int) -> dict[str, Any]:
@@ -471,6 +869,13 @@ def get_score(conn: Any, quarter: int) -> dict[str, Any]:
     return row
 
 
+def get_scores_many(conn: Any, quarters: tuple[int, ...] = (1, 2, 3, 4)) -> dict[int, dict[str, Any]]:
+    """Fetch score rows for several quarters in one query, keyed by quarter."""
+    placeholders, params = _in_params(list(quarters), prefix="q")
+    rows = _fetchall(conn, f"SELECT * FROM scores WHERE quarter IN ({placeholders}) ORDER BY quarter", params)
+    return {int(r["quarter"]): r for r in rows}
+
+
 def set_score(conn: Any, *, quarter: int, rows_score: int, cols_score: int, updated_by_user_id: int) -> None:
     _execute(
         conn,
@@ -481,6 +886,7 @@ def set_score(conn: Any, *, quarter: int, rows_score: int, cols_score: int, upda
         """,
         {"rows_score": rows_score, "cols_score": cols_score, "ts": _now_ts(), "uid": updated_by_user_id, "q": quarter},
     )
+    bump_board_version(conn)
 
 
 def recent_audit(conn: Any, limit: int = 50) -> list[dict[str, Any]]:
@@ -545,6 +951,8 @@ def delete_user_and_cleanup(conn: Any, *, user_id: int) -> int:
     )
     _execute(conn, "UPDATE audit_log SET actor_user_id = NULL WHERE actor_user_id = :id", {"id": uid})
     _execute(conn, "DELETE FROM users WHERE id = :id", {"id": uid})
+    _USER_NAME_CACHE.clear()
+    bump_board_version(conn)
     return released
 
 
@@ -556,25 +964,23 @@ def reset_board_keep_users(conn: Any) -> None:
         "UPDATE scores SET rows_score = 0, cols_score = 0, updated_at_ts = :ts, updated_by_user_id = NULL",
         {"ts": now},
     )
-    set_setting(conn, "row_digits_json", "")
-    set_setting(conn, "col_digits_json", "")
-    set_setting(conn, "board_locked", "0")
+    # One upsert (and one board_version bump) for the three setting resets.
+    set_settings_bulk(conn, {"row_digits_json": "", "col_digits_json": "", "board_locked": "0"})
 
 
 def prune_audit_log(conn: Any, *, keep_last: int) -> None:
     if int(keep_last) <= 0:
         _execute(conn, "DELETE FROM audit_log")
         return
-    _execute(
+    # Keyset delete: one index seek for the cutoff id, then a PK range
+    # delete, instead of materializing the keep set with NOT IN.
+    row = _fetchone(
         conn,
-        """
-        DELETE FROM audit_log
-        WHERE id NOT IN (
-          SELECT id FROM audit_log ORDER BY id DESC LIMIT :keep
-        )
-        """,
+        "SELECT id FROM audit_log ORDER BY id DESC LIMIT 1 OFFSET :keep",
         {"keep": int(keep_last)},
     )
+    if row:
+        _execute(conn, "DELETE FROM audit_log WHERE id <= :cutoff", {"cutoff": int(row["id"])})
 
 
 def vacuum_optimize(conn: Any) -> None:
@@ -585,6 +991,17 @@ def vacuum_optimize(conn: Any) -> None:
     conn.execute("PRAGMA optimize")
 
 
+def checkpoint_wal(conn: Any) -> None:
+    """Fold the WAL back into the main DB file so it is self-contained.
+
+    Used before handing the .db file out as a backup; no-op on Postgres.
+    """
+    if not _is_sqlite_conn(conn):
+        return
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
 def is_username_taken_error(exc: Exception) -> bool:
     if isinstance(exc, sqlite3.IntegrityError):
         return True
@@ -598,12 +1015,8 @@ def is_username_taken_error(exc: Exception) -> bool:
 
 
 def get_state_version(conn: Any) -> str:
-    squares_ts = _fetchone(conn, "SELECT COALESCE(MAX(updated_at_ts), 0) AS v FROM squares") or {"v": 0}
-    settings_ts = _fetchone(conn, "SELECT COALESCE(MAX(updated_at_ts), 0) AS v FROM settings") or {"v": 0}
-    scores_ts = _fetchone(conn, "SELECT COALESCE(MAX(updated_at_ts), 0) AS v FROM scores") or {"v": 0}
-    audit_id = _fetchone(conn, "SELECT COALESCE(MAX(id), 0) AS v FROM audit_log") or {"v": 0}
-    users_id = _fetchone(conn, "SELECT COALESCE(MAX(id), 0) AS v FROM users") or {"v": 0}
-    return f"{int(squares_ts['v'])}-{int(settings_ts['v'])}-{int(scores_ts['v'])}-{int(audit_id['v'])}-{int(users_id['v'])}"
+    # Single-row read: every write path bumps `board_version` via bump_board_version.
+    return get_setting(conn, "board_version") or "0"
 
 
 def ensure_admin_from_env(conn: Any) -> int | None:
@@ -617,36 +1030,45 @@ def ensure_admin_from_env(conn: Any) -> int | None:
     # Local import to keep layering simple.
     import security  # type: ignore
 
+    # Fast path: if the admin row already matches the env config, one KDF
+    # verify is all this boot costs — no fresh hash (a second KDF round),
+    # no write, no board_version bump.
     row = get_user_by_username(conn, username)
-    salt_b64, hash_b64 = security.hash_password(password)
-    if not row:
-        user_id = create_user(
-            conn,
-            username=username,
-            display_name=display_name or username,
-            salt_b64=salt_b64,
-            password_hash_b64=hash_b64,
-            is_admin=True,
+    if (
+        row
+        and bool(row["is_admin"])
+        and str(row["display_name"]) == (display_name or username)
+        and security.verify_password(
+            password, salt_b64=str(row["salt_b64"]), password_hash_b64=str(row["password_hash_b64"])
         )
-        return user_id
+    ):
+        return int(row["id"])
 
-    user_id = int(row["id"])
-    _execute(
+    salt_b64, hash_b64 = security.hash_password(password)
+    # Single UPSERT instead of SELECT + INSERT/UPDATE branches: one
+    # round-trip at boot, and no race window between workers starting at
+    # the same time against Postgres.
+    row = _fetchone(
         conn,
         """
-        UPDATE users
-        SET is_admin = :is_admin,
-            salt_b64 = :salt_b64,
-            password_hash_b64 = :password_hash_b64,
-            display_name = :display_name
-        WHERE id = :id
+        INSERT INTO users (username, display_name, salt_b64, password_hash_b64, is_admin, created_at_ts)
+        VALUES (:username, :display_name, :salt_b64, :password_hash_b64, :is_admin, :ts)
+        ON CONFLICT(username) DO UPDATE SET
+            is_admin = excluded.is_admin,
+            salt_b64 = excluded.salt_b64,
+            password_hash_b64 = excluded.password_hash_b64,
+            display_name = excluded.display_name
+        RETURNING id
         """,
         {
-            "is_admin": True,
+            "username": username,
+            "display_name": display_name or username,
             "salt_b64": salt_b64,
             "password_hash_b64": hash_b64,
-            "display_name": display_name or str(row["display_name"]),
-            "id": user_id,
+            "is_admin": True,
+            "ts": _now_ts(),
         },
     )
-    return user_id
+    _USER_NAME_CACHE.clear()
+    bump_board_version(conn)
+    return int(row["id"]) if row else None
@@ -12,16 +12,19 @@ def parse_digits(value: str) -> list[int] | None:
         data = json.loads(value)
     except json.JSONDecodeError:
         return None
-    if not isinstance(data, list) or len(data) != 10:
+    if type(data) is not list or len(data) != 10:
         return None
-    digits: list[int] = []
+    # Single pass with a bitmask for uniqueness: all ten digits seen exactly
+    # once iff the mask is 0b1111111111. `type(x) is int` also rejects JSON
+    # booleans, which isinstance would let through (bool subclasses int).
+    seen = 0
     for x in data:
-        if not isinstance(x, int) or x < 0 or x > 9:
+        if type(x) is not int or x < 0 or x > 9:
             return None
-        digits.append(x)
-    if len(set(digits)) != 10:
+        seen |= 1 << x
+    if seen != 0x3FF:
         return None
-    return digits
+    return data
 
 
 def digits_to_json(digits: Iterable[int]) -> str:
@@ -45,9 +48,27 @@ class QuarterWinner:
 
 
 def compute_winner_square_id(*, rows_score: int, cols_score: int, row_digits: list[int], col_digits: list[int]) -> int:
-    rows_last = rows_score % 10
-    cols_last = cols_score % 10
-    row_index = row_digits.index(rows_last)
-    col_index = col_digits.index(cols_last)
-    return square_id(row_index, col_index)
+    return square_id(invert_digits(row_digits)[rows_score % 10], invert_digits(col_digits)[cols_score % 10])
+
+
+def invert_digits(digits: list[int]) -> list[int]:
+    """Inverse permutation: inv[d] is the board position of digit d."""
+    inv = [0] * 10
+    for i, d in enumerate(digits):
+        inv[d] = i
+    return inv
+
+
+def compute_winner_square_ids(
+    *, scores: dict[int, tuple[int, int]], row_digits: list[int], col_digits: list[int]
+) -> dict[int, int]:
+    """Winning square ids for several quarters at once.
+
+    `scores` maps quarter -> (rows_score, cols_score). The inverse digit
+    permutations are built once, so each quarter is plain O(1) arithmetic
+    instead of two list.index() scans.
+    """
+    row_inv = invert_digits(row_digits)
+    col_inv = invert_digits(col_digits)
+    return {q: row_inv[r % 10] * 10 + col_inv[c % 10] for q, (r, c) in scores.items()}
 
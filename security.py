@@ -4,13 +4,22 @@ import base64
 import hashlib
 import hmac
 import os
+from functools import lru_cache
+
+# KDF work factor. Hosts on slow CPUs can tune this down via env, but the
+# value must stay fixed once accounts exist: stored hashes do not record
+# their iteration count, so verification always uses the current setting.
+PBKDF2_ITERS = int(os.getenv("PBKDF2_ITERS", "200000"))
 
 
 def _b64e(raw: bytes) -> str:
     return base64.b64encode(raw).decode("ascii")
 
 
-def _b64d(txt: str) -> bytes:
+@lru_cache(maxsize=1024)
+def _b64d_cached(txt: str) -> bytes:
+    # Salts and stored hashes are constant per user; skip the re-decode on
+    # repeat logins. compare_digest works the same over cached bytes.
     return base64.b64decode(txt.encode("ascii"))
 
 
@@ -18,14 +27,29 @@ def hash_password(password: str, *, salt: bytes | None = None) -> tuple[str, str
     if salt is None:
         salt = os.urandom(16)
     pwd = password.encode("utf-8")
-    derived = hashlib.pbkdf2_hmac("sha256", pwd, salt, 200_000)
+    derived = hashlib.pbkdf2_hmac("sha256", pwd, salt, PBKDF2_ITERS)
     return _b64e(salt), _b64e(derived)
 
 
 def verify_password(password: str, *, salt_b64: str, password_hash_b64: str) -> bool:
-    salt = _b64d(salt_b64)
+    salt = _b64d_cached(salt_b64)
     pwd = password.encode("utf-8")
-    derived = hashlib.pbkdf2_hmac("sha256", pwd, salt, 200_000)
-    expected = _b64d(password_hash_b64)
+    derived = hashlib.pbkdf2_hmac("sha256", pwd, salt, PBKDF2_ITERS)
+    expected = _b64d_cached(password_hash_b64)
     return hmac.compare_digest(derived, expected)
 
+
+# Fixed salt/hash pair with no matching password (derived from discarded random
+# bytes). Used so unknown-username logins cost the same as wrong-password ones.
+_DUMMY_SALT_B64 = "FnpaoPKKCBZoUK/p9KgggA=="
+_DUMMY_HASH_B64 = "RNvcNv2Po4hkrWJDoYdp9v3CtI1/lX2nBTV6OUcCeh4="
+
+
+def dummy_verify(password: str) -> bool:
+    """Run a full KDF round against a throwaway hash; always returns False.
+
+    Keeps the timing of "no such user" indistinguishable from "wrong password"
+    to avoid username enumeration.
+    """
+    return verify_password(password, salt_b64=_DUMMY_SALT_B64, password_hash_b64=_DUMMY_HASH_B64)
+